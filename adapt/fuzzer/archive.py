@@ -1,6 +1,7 @@
 from abc import ABC
 from abc import abstractmethod
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from imageio import imwrite
 from pathlib import Path
 import numpy as np
@@ -15,11 +16,12 @@ def Archive(input, label, append='meta'):
       of "meta", "min_dist", or "all". By default, "meta" will be used.
 
   Returns:
-    An object created from ArchiveMeta if append is "meta", or an object creaed
-    from ArchiveAll if append is "all".
+    An object created from ArchiveMeta if append is "meta", an object created
+    from ArchiveMinDist if append is "min_dist", or an object creaed from
+    ArchiveAll if append is "all".
 
   Raises:
-    ValueError: When append is not one of "meta" or "all"
+    ValueError: When append is not one of "meta", "min_dist", or "all".
   '''
 
   # Convert to lower case.
@@ -38,7 +40,7 @@ def Archive(input, label, append='meta'):
   
   # Unknown append option.
   else:
-    raise ValueError('The argument append must be one of "meta" or "all".')
+    raise ValueError('The argument append must be one of "meta", "min_dist", or "all".')
 
 
 class ArchiveBase(ABC):
@@ -64,22 +66,36 @@ class ArchiveBase(ABC):
     self.adversarials = 0
     self.count = defaultdict(int)
 
-    self.found_labels = defaultdict(bool)
-    self.distance = defaultdict(list)
+    self.found_labels = set()
+
+    # Distances of all found inputs and the identifiers of their labels, stored
+    # in two parallel buffers that grow geometrically. Only the first
+    # `self.total` elements of the buffers are valid.
+    self.distances = np.empty(1024, dtype=np.float32)
+    self.distance_labels = np.empty(1024, dtype=np.int32)
+    self.label_ids = {}
 
     # Storage for created inputs.
     self.inputs = defaultdict(list)
 
-    # Storate for coverages.
-    self.timestamp = []
+    # Storage for coverages, stored with their times in two parallel buffers
+    # that grow geometrically. Only the first `self.timestamps` elements of
+    # the buffers are valid.
+    self.timestamp_times = np.empty(1024, dtype=np.float64)
+    self.timestamp_coverages = np.empty(1024, dtype=np.float64)
+    self.timestamps = 0
 
-  def add(self, input, label, distance, time, coverage):
+  def add(self, input, label, distance, time=None, coverage=None):
     '''Add a newly found input.
     
     Args:
-      input: A newly found input.
+      input: A newly found input as a numpy array. The archive may keep a
+        reference to it instead of a copy.
       label: A label that the newly found input classified into.
       distance: A distance (e.g. l2 distance) from origianl input.
+      time: A time in seconds from the start of testing. If not given with
+        `coverage`, no timestamp is recorded.
+      coverage: A coverage achieved after the input is found.
     '''
 
     # Update meta varaibles.
@@ -88,12 +104,58 @@ class ArchiveBase(ABC):
       self.adversarials += 1
     self.count[label] += 1
 
-    self.found_labels[label] = True
-    self.distance[label].append(distance)
+    self.found_labels.add(label)
+
+    # Grow the buffers if they are full.
+    if self.total > len(self.distances):
+      self.distances = np.resize(self.distances, 2 * len(self.distances))
+      self.distance_labels = np.resize(self.distance_labels, 2 * len(self.distance_labels))
+
+    # Store the distance with the identifier of the label.
+    self.distances[self.total - 1] = distance
+    self.distance_labels[self.total - 1] = self.label_ids.setdefault(label, len(self.label_ids))
 
     self.append(input, label, distance)
 
-    self.timestamp.append((time, coverage))
+    if time is not None and coverage is not None:
+      self.stamp(time, coverage)
+
+  def stamp(self, time, coverage):
+    '''Record a coverage achieved at a time.
+
+    This is the only way to add a timestamp to the archive.
+
+    Args:
+      time: A time in seconds from the start of testing.
+      coverage: A coverage achieved at the time.
+    '''
+
+    # Grow the buffers if they are full.
+    if self.timestamps == len(self.timestamp_times):
+      self.timestamp_times = np.resize(self.timestamp_times, 2 * len(self.timestamp_times))
+      self.timestamp_coverages = np.resize(self.timestamp_coverages, 2 * len(self.timestamp_coverages))
+
+    self.timestamp_times[self.timestamps] = time
+    self.timestamp_coverages[self.timestamps] = coverage
+    self.timestamps += 1
+
+  @property
+  def timestamp(self):
+    '''A tuple of pairs of a time and the coverage achieved at the time.
+
+    The pairs are read from the timestamp buffers, so the tuple is a read-only
+    view. Use `stamp` to record a new coverage.
+    '''
+
+    return tuple(zip(self.timestamp_times[:self.timestamps].tolist(), self.timestamp_coverages[:self.timestamps].tolist()))
+
+  @property
+  def distance(self):
+    '''A dictionary of the distances of the found inputs for each label.'''
+
+    distances = self.distances[:self.total]
+    labels = self.distance_labels[:self.total]
+    return {label: distances[labels == i] for label, i in self.label_ids.items()}
 
   @abstractmethod
   def append(self, input, label, dist):
@@ -114,30 +176,35 @@ class ArchiveBase(ABC):
       file: A output stream to print. By default, use stdout.
     '''
 
+    # Sum up the distances for each label.
+    sums = np.bincount(self.distance_labels[:self.total], weights=self.distances[:self.total], minlength=len(self.label_ids))
+    total_sum = np.sum(sums)
+    orig_sum = sums[self.label_ids[self.label]] if self.label in self.label_ids else 0
+
     print('----------', file=file)
 
     # Print meta data of total.
     print('Total inputs: {}'.format(self.total), file=file)
-    print('  Average distance: {}'.format(np.mean(np.concatenate([self.distance[label] for label in self.distance.keys()]))), file=file)
+    print('  Average distance: {}'.format('-' if self.total == 0 else total_sum / self.total), file=file)
     
     # Print meta data of adversarials.
     print('Total adversarials: {}'.format(self.adversarials), file=file)
-    print('  Average distance: {}'.format('-' if self.adversarials == 0 else np.mean(np.concatenate([self.distance[label] for label in self.distance.keys() if label != self.label]))), file=file)
+    print('  Average distance: {}'.format('-' if self.adversarials == 0 else (total_sum - orig_sum) / self.adversarials), file=file)
 
     # Print coverages.
     print('Coverage', file=file)
-    print('  Original: {}'.format(self.timestamp[0][1]))
-    print('  Achieved: {}'.format(self.timestamp[-1][1]))
+    print('  Original: {}'.format('-' if self.timestamps == 0 else self.timestamp_coverages[0]), file=file)
+    print('  Achieved: {}'.format('-' if self.timestamps == 0 else self.timestamp_coverages[self.timestamps - 1]), file=file)
 
     print('----------', file=file)
 
     # Print meta data for original label.
     print('Original label: {}'.format(self.label), file=file)
     print('  Count: {}'.format(self.count[self.label]), file=file)
-    print('  Average distance: {}'.format('-' if self.count[self.label] == 0 else np.mean(self.distance[self.label])), file=file)
+    print('  Average distance: {}'.format('-' if self.count[self.label] == 0 else orig_sum / self.count[self.label]), file=file)
 
     # Print meta data for each label found, except for original label.
-    for label in self.found_labels.keys():
+    for label in self.found_labels:
 
       # Skip original label.
       if label == self.label:
@@ -148,15 +215,16 @@ class ArchiveBase(ABC):
       # Print meta data for each label found.
       print('Label: {}'.format(label), file=file)
       print('  Count: {}'.format(self.count[label]), file=file)
-      print('  Average distance: {}'.format(np.mean(self.distance[label])), file=file)
+      print('  Average distance: {}'.format(sums[self.label_ids[label]] / self.count[label]), file=file)
     
     print('----------', file=file)
 
-  def save_inputs(self, path, deprocess=None, prefix=None, lowest_distance=False):
+  def save_inputs(self, path, deprocess=None, prefix=None, lowest_distance=False, compress_level=1):
     '''Save inputs in the archive.
 
-    This method will save inputs in the `path` folder. The file name will be set as
-    "{label of a found input}-{identifier number}" with the `prefix` in front of it.
+    This method will save inputs in the `path` folder as PNG files. The file name
+    will be set as "{label of a found input}-{identifier number}.png" with the
+    `prefix` in front of it. Images are encoded in parallel threads.
 
     Args:
       path: A folder to save inputs.
@@ -166,42 +234,55 @@ class ArchiveBase(ABC):
         be used.
       lowest_distance: A boolean. If true, find one with the lowest distance,
         and save it.
+      compress_level: An integer in [0, 9]. The zlib compression level of PNG
+        files. By default, use 1 for fast encoding.
     '''
 
     # Create the output folder.
     path = Path(path)
     path.mkdir(parents=True, exist_ok=True)
 
+    # Check deprocess.
+    if not deprocess:
+      deprocess = lambda x: x
+
     # Check prefix.
     if not prefix:
       prefix = str(self.label) + '-'
     prefix = str(prefix)
 
+    # Collect the files to write.
+    files = []
+
     # For each label found.
-    for label in self.found_labels.keys():
+    for label in self.found_labels:
 
       # If lowest distance.
       if lowest_distance:
-        lowest = np.argmin(self.distance[label])
+        lowest = np.argmin(self.distances[:self.total][self.distance_labels[:self.total] == self.label_ids[label]])
         inputs = [self.inputs[label][lowest]]
 
       # Else.
       else:
         inputs = self.inputs[label]
 
-      # Save inputs.
       for i, img in enumerate(inputs):
-        imwrite(path / '{}{}-{}'.format(prefix, label, i), deprocess(img))
+        files.append((path / '{}{}-{}.png'.format(prefix, label, i), img))
+
+    # Save inputs. Encoding releases the GIL, so threads write files in parallel.
+    with ThreadPoolExecutor() as pool:
+      list(pool.map(lambda f: imwrite(f[0], deprocess(f[1]), compress_level=compress_level), files))
 
 class ArchiveMeta(ArchiveBase):
   '''An archive class that only stores meta data (label and distance)'''
 
-  def append(self, input, label):
+  def append(self, input, label, dist):
     '''Append a created input.
 
     Args:
       input: A created input.
       label: A label that the created input classified into.
+      dist: A distance (e.g. l2 distance) from origianl input.
     '''
 
     # Do nothing.
@@ -218,8 +299,9 @@ class ArchiveAll(ArchiveBase):
       dist: A distance (e.g. l2 distance) from origianl input.
     '''
 
-    # Add the created input.
-    self.inputs[label].append(np.array(input))
+    # Add the created input. The input is not copied, so callers should not
+    # modify it after.
+    self.inputs[label].append(np.ascontiguousarray(input))
 
 class ArchiveMinDist(ArchiveBase):
   '''An archive class that only stores the inputs with mininum distances.'''
@@ -245,15 +327,12 @@ class ArchiveMinDist(ArchiveBase):
       dist: A distance (e.g. l2 distance) from origianl input.
     '''
 
-    # If a found input is firstly found input.
+    # If a found input is firstly found input, copy it to own the buffer.
     if len(self.inputs[label]) == 0:
-      self.min_dist[label] == dist
+      self.min_dist[label] = dist
       self.inputs[label].append(np.array(input))
 
-    # If there are already inputs found with the given label.
-    else:
-      
-      # If a newly found input has mininum distance.
-      if self.min_dist[label] > dist:
-        self.min_dist[label] = dist
-        self.inputs[label][0] = np.array(input)
+    # If a newly found input has mininum distance, overwrite the buffer.
+    elif self.min_dist[label] > dist:
+      self.min_dist[label] = dist
+      np.copyto(self.inputs[label][0], input)
@@ -1,12 +1,15 @@
+from collections import deque
 import numpy as np
 import tensorflow as tf
-import tensorflow.keras.backend as K
 
 from adapt.network import Network
 from adapt.fuzzer.archive import Archive
 from adapt.metric import NeuronCoverage
 from adapt.strategy import RandomStrategy
 from adapt.utils.functional import coverage
+from adapt.utils.functional import flatten
+from adapt.utils.functional import or_and_coverage
+from adapt.utils.functional import popcount
 from adapt.utils.timer import Timeout
 from adapt.utils.timer import Timer
 
@@ -41,8 +44,8 @@ class WhiteBoxFuzzer:
       lr: A floating point number. A learning rate to apply when generating
         the next input using gradients. By default, use 0.1.
       trail: A positive integer. Trails to apply one set of selected neurons.
-      decode: A function that gets logits and return the label. By default,
-        uses `np.argmax`.
+      decode: A function that gets logits as a batch of one, and return the
+        label. By default, uses `np.argmax`.
 
     Raises:
       ValueError: When arguments are not in their proper range.
@@ -113,12 +116,20 @@ class WhiteBoxFuzzer:
         not printing. Be default, set to be 0.
     '''
 
+    # Use the layout of the network in the metric. The metric may be shared with
+    # the fuzzers of other networks, so it is bound for every testing.
+    self.metric.bind(self.network)
+
+    # The original input as a batch of one. Created once, and reused to seed
+    # the worklist and to measure the perturbation.
+    orig_input = np.ascontiguousarray(self.input[np.newaxis], dtype=np.float32)
+
     # Get the original properties.
-    internals, logits = self.network.predict(np.array([self.input]))
+    internals, logits = self.network.forward(orig_input)
     orig_index = np.argmax(logits)
     orig_norm = np.linalg.norm(self.input)
-    self.label = self.decode(np.array([logits]))
-    self.covered = self.metric(internals=internals, logits=logits)
+    self.label = self.decode(logits.numpy()[np.newaxis])
+    self.covered = self.metric.covered(internals=internals, logits=logits)
     self.orig_coverage = coverage(self.covered)
 
     # Initialize variables.
@@ -127,6 +138,34 @@ class WhiteBoxFuzzer:
     # Initialize the strategy.
     self.strategy = self.strategy.init(covered=self.covered, label=self.label)
 
+    # Keep the coverage vectors as a single flat vector of packed bits while
+    # fuzzing.
+    size = flatten(self.covered).size
+    covered_bits = np.packbits(flatten(self.covered))
+
+    # The coverage only changes when a new coverage vector is applied, so the
+    # current coverage is carried over instead of being recalculated.
+    cur_cov = popcount(covered_bits) / size
+
+    # Offsets of the layers in the flat list of neurons, to convert the
+    # locations of the selected neurons. Taken from the network, not from the
+    # metric, since the locations are of the neurons of the network.
+    offsets = self.network.offsets
+
+    # The compiled trail of the network for the input, with the variables of
+    # the input under mutation and of its difference from the original input.
+    step, mutated, difference = self.network.trail(self.input.shape)
+
+    # The arguments of the trail that do not change while fuzzing.
+    args = (np.int32(orig_index), np.float32(self.lr), np.float32(self.neuron_weight), np.float32(self.class_weight))
+
+    # Run a trail before the timer starts, so that the time budget is not spent
+    # on the compilation. Only the first testing of the network compiles, and
+    # the generated input is discarded.
+    mutated.assign(orig_input)
+    difference.assign(tf.zeros_like(difference))
+    step(tf.zeros([self.k], dtype=tf.int32), *args)
+
     # Set timer.
     timer = Timer(hours, minutes, seconds)
     if verbose > 0:
@@ -137,55 +176,51 @@ class WhiteBoxFuzzer:
       while True:
 
         # Create worklist.
-        worklist = [tf.identity(np.array([self.input]))]
+        worklist = deque([orig_input])
 
         # While worklist is not empty:
         while len(worklist) > 0:
 
           # Get input
-          input = worklist.pop(0)
+          seed = worklist.popleft()
+          mutated.assign(seed)
+          difference.assign(seed - orig_input)
 
           # Select neurons.
           neurons = self.strategy(k=self.k)
 
+          # Convert the locations of the selected neurons to a tensor of the
+          # indices in the flat list of neurons, once for all trails.
+          neurons = np.asarray(neurons, dtype=np.int32).reshape(-1, 2)
+          indices = tf.constant(offsets[neurons[:, 0]] + neurons[:, 1], dtype=tf.int32)
+
           # Try trail times.
           for _ in range(self.trail):
 
-            # Get original coverage
-            orig_cov = coverage(self.covered)
-
-            # Calculate gradients.
-            with tf.GradientTape() as t:
-              t.watch(input)
-              internals, logits = self.network.predict(input)
-              loss = self.neuron_weight * K.sum([internals[li][ni] for li, ni in neurons]) - self.class_weight * logits[orig_index]
-            dl_di = t.gradient(loss, input)
-
-            # Generate the next input using gradients.
-            input += self.lr * dl_di
-
-            # Get the properties of the generated input.
-            internals, logits = self.network.predict(input)
+            # Generate the next input, and get its properties.
+            internals, logits, perturbation = step(indices, *args)
 
-            covered = self.metric(internals=internals, logits=logits)
-            label = self.decode(np.array([logits]))
+            covered = self.metric.covered(internals=internals, logits=logits)
+            label = self.decode(logits.numpy()[np.newaxis])
 
-            distance = np.linalg.norm(input - self.input) / orig_norm
+            distance = float(perturbation) / orig_norm
 
             # Update varaibles in fuzzer
-            self.covered = np.bitwise_or(self.covered, covered)
+            new_cov = or_and_coverage(covered_bits, flatten(covered), size)
 
-            new_cov = coverage(self.covered)
+            # Copy the generated input to the host once.
+            generated = mutated.numpy()
 
             # If coverage increased.
-            if new_cov > orig_cov and distance < self.delta:
-              worklist.append(tf.identity(input))
+            if new_cov > cur_cov and distance < self.delta:
+              worklist.append(generated)
+            cur_cov = new_cov
 
             # Feedback to strategy.
             self.strategy.update(covered=covered, label=label)
 
             # Add created input.
-            self.archive.add(input, label, distance, timer.elapsed.total_seconds(), new_cov)
+            self.archive.add(generated, label, distance, timer.elapsed.total_seconds(), new_cov)
 
             # Check timeout.
             timer.check_timeout()
@@ -200,10 +235,11 @@ class WhiteBoxFuzzer:
         print('Stopped by the user.')
 
     # Update meta variables.
-    self.coverage = coverage(self.covered)
+    self.covered = np.unpackbits(covered_bits, count=size).astype(bool)
+    self.coverage = popcount(covered_bits) / size
     self.start_time = timer.start_time
     self.time_consumed = timer.elapsed.total_seconds()
-    self.archive.timestamp.append((self.time_consumed, self.coverage))
+    self.archive.stamp(self.time_consumed, self.coverage)
 
     if verbose > 0:
       print('Done!')
@@ -1,5 +1,6 @@
 from abc import ABC
 from abc import abstractmethod
+import numpy as np
 
 class Metric(ABC):
   '''Abstract metric class (used as an implementation base).'''
@@ -10,6 +11,30 @@ class Metric(ABC):
     *** This method could be updated, but not mandatory. ***
     '''
 
+    # Sizes of the layers, and their offsets in a flat coverage vector. Set by
+    # `bind`, or calculated from the first internals.
+    self.layer_sizes = None
+    self.offsets = None
+
+  def bind(self, network):
+    '''Use the layout of the layers of a network.
+
+    The sizes and the offsets of the layers are taken from the network. A fuzzer
+    binds its metric at the start of every testing, so a metric can be shared
+    by fuzzers testing different networks one after another.
+
+    Args:
+      network: A wrapped Keras model with `adapt.Network`.
+
+    Returns:
+      Self for possible call chains.
+    '''
+
+    self.layer_sizes = network.layer_sizes
+    self.offsets = network.offsets
+
+    return self
+
   def __call__(self, **kwargs):
     '''Python magic call method.
     
@@ -20,7 +45,7 @@ class Metric(ABC):
 
   @abstractmethod
   def covered(self, **kwargs):
-    '''Gets output of network and returns a list of corresponding coverage vectors.
+    '''Gets output of network and returns a corresponding flat coverage vector.
     
     *** This method should be implemented. ***
 
@@ -31,5 +56,27 @@ class Metric(ABC):
       logits: Output logits.
 
     Returns:
-      A list of coverage vectors that identifies which neurons are activated.
+      A flat coverage vector that identifies which neurons are activated. The
+      coverage vectors of the layers are placed at `offsets` in order.
     '''
+
+  def layout(self, internals):
+    '''Returns the offsets of the layers in a flat coverage vector.
+
+    If the metric is not bound to a network, the offsets are calculated from the
+    first internals, and cached since the structure of the network does not
+    change.
+
+    Args:
+      internals: A list of the values of internal neurons in each layer.
+
+    Returns:
+      A list of offsets with the length of the number of layers plus one. The
+      last element is the total number of neurons.
+    '''
+
+    if self.offsets is None:
+      self.layer_sizes = np.array([int(i.shape[0]) for i in internals], dtype=np.int32)
+      self.offsets = np.cumsum(np.concatenate([[0], self.layer_sizes]))
+
+    return self.offsets
@@ -1,4 +1,5 @@
 import numpy as np
+import tensorflow as tf
 
 from adapt.metric.metric import Metric
 
@@ -35,16 +36,19 @@ class NeuronCoverage(Metric):
       raise ValueError('The argument theta is not in [0, 1].')
     self.theta = theta
 
+    # Identifiers of the layers that each neuron belongs to. Created lazily.
+    self.segment_ids = None
+
   def covered(self, internals, **kwargs):
-    '''Returns a list of neuron coverage vectors.
+    '''Returns a flat neuron coverage vector.
     
     Args:
       internals: A list of the values of internal neurons in each layer.
       kwargs: Not used. Present for the compatibility with the super class.
     
     Returns:
-      A neuron coverage vecter that identifies which neurons have higher value
-      than theta.
+      A flat neuron coverage vecter that identifies which neurons have higher
+      value than theta.
 
     Example:
 
@@ -59,24 +63,72 @@ class NeuronCoverage(Metric):
     tf.Tensor([-1.8598881  1.0225831], shape=(2,), dtype=float32)
     tf.Tensor([-0.2890836  1.2187911 -0.7577767], shape=(3,), dtype=float32)
     >>> covered = metric(internals=internals)
-    >>> for x in covered:
-    ...   print(x)
-    ...
-    [ True False False]
-    [False  True]
-    [False  True False]
+    >>> covered
+    array([ True, False, False, False,  True, False,  True, False])
     '''
 
-    # Get numpy array.
-    internals = [i.numpy() for i in internals]
+    # Identifiers of the layers that each neuron belongs to.
+    segment_ids = self.segments(internals)
+
+    # Concatenate the values of all layers on the device, so that the results
+    # are copied to the host only once.
+    values = tf.concat(internals, axis=0)
+
+    # Minimum and maximum values of each layer.
+    mn = tf.math.segment_min(values, segment_ids)
+    mx = tf.math.segment_max(values, segment_ids)
+
+    # Normalizing the values into [0, 1] and comparing them with theta is
+    # equivalent to comparing the values with the threshold below. This does
+    # not create the normalized values.
+    threshold = mn + self.theta * (mx - mn + 1e-6)
+
+    # A layer with near-constant values covers no neuron, so its threshold is
+    # raised to infinity. This costs a comparison per layer, not per neuron.
+    threshold = tf.where(mx - mn >= 1e-6, threshold, tf.fill(tf.shape(threshold), float('inf')))
 
-    # Normalize the values into [0, 1].
-    internals = [(i - np.min(i)) / (np.max(i) - np.min(i) + 1e-6) for i in internals]
+    # Find neurons with the values higher than the threshold of their layers.
+    covered = tf.greater(values, tf.gather(threshold, segment_ids))
+
+    return covered.numpy()
+
+  def bind(self, network):
+    '''Cache the layout of the layers of a network.
+
+    Args:
+      network: A wrapped Keras model with `adapt.Network`.
+
+    Returns:
+      Self for possible call chains.
+    '''
+
+    layer_sizes = self.layer_sizes
+    super(NeuronCoverage, self).bind(network)
+
+    # Recreate the identifiers only for a new layout.
+    if layer_sizes is None or not np.array_equal(layer_sizes, self.layer_sizes):
+      self.segment_ids = None
+
+    return self
+
+  def segments(self, internals):
+    '''Returns the identifiers of the layers that each neuron belongs to.
+
+    The identifiers are created once as a tensor from the layout of the layers,
+    and reused for the following calls.
+
+    Args:
+      internals: A list of the values of internal neurons in each layer.
+
+    Returns:
+      A 1-D int32 tensor with the length of the total number of neurons.
+    '''
 
-    # Find neurons with the values higher than theta.
-    covered = [np.where(i > self.theta, True, False) for i in internals]
+    if self.segment_ids is None:
+      self.layout(internals)
+      self.segment_ids = tf.constant(np.repeat(np.arange(len(self.layer_sizes)), self.layer_sizes), dtype=tf.int32)
 
-    return np.array(covered)
+    return self.segment_ids
 
   def __repr__(self):
     '''Returns a string representation of object.
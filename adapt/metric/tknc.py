@@ -1,4 +1,4 @@
-import numpy as np
+import tensorflow as tf
 
 from adapt.metric.metric import Metric
 
@@ -36,14 +36,14 @@ class TopkNeuronCoverage(Metric):
     self.k = int(k)
 
   def covered(self, internals, **kwargs):
-    '''Returns a list of top-k neuron coverage vectors.
+    '''Returns a flat top-k neuron coverage vector.
     
     Args:
       internals: A list of the values of internal neurons in each layer.
       kwargs: Not used. Present for the compatibility with the super class.
     
     Returns:
-      A top-k neuron coverage vecter that identifies which neurons within
+      A flat top-k neuron coverage vecter that identifies which neurons within
       highest k-th values in their layers.
 
     Example:
@@ -59,33 +59,31 @@ class TopkNeuronCoverage(Metric):
     tf.Tensor([-2.316517  -0.2972477], shape=(2,), dtype=float32)
     tf.Tensor([-0.6506158 -0.2905271  1.0730451], shape=(3,), dtype=float32)
     >>> covered = metric(internals=internals)
-    >>> for x in covered:
-    ...   print(x)
-    ...
-    [ True False False]
-    [False  True]
-    [False False  True]
+    >>> covered
+    array([ True, False, False, False,  True, False, False,  True])
     '''
 
+    # The sizes of the layers.
+    self.layout(internals)
+
     # A list to store top-k neuron coverage vectors.
     covered = []
 
     # Loop for each layer.
-    for i in internals:
+    for i, n in zip(internals, self.layer_sizes.tolist()):
 
       # Guard for the value of k.
-      k = min(self.k, i.shape.as_list()[0])
-
-      # Find out the indices of k highest values.
-      idx = np.argpartition(i, -k)[-k:]
+      k = min(self.k, n)
 
-      # Create a top-k coverage vector.
-      vec = np.zeros(i.shape, dtype=bool)
-      vec[idx] = True
-      covered.append(vec)
+      # Find out the indices of k highest values where the values live.
+      _, idx = tf.math.top_k(i, k=k)
 
-    return np.array(covered)
+      # Create a top-k coverage vector. Exactly k neurons are covered, even if
+      # some neurons tie with the k-th highest value (e.g. dead ReLU channels).
+      covered.append(tf.cast(tf.scatter_nd(idx[:, tf.newaxis], tf.ones_like(idx), [n]), tf.bool))
 
+    # Copy the flat top-k neuron coverage vector at once.
+    return tf.concat(covered, axis=0).numpy()
 
   def __repr__(self):
     '''Returns a string representation of object.
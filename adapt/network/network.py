@@ -2,6 +2,7 @@ from tensorflow.keras.layers import Flatten
 from tensorflow.keras.layers import InputLayer
 from tensorflow.keras.models import Model
 import numpy as np
+import tensorflow as tf
 import tensorflow.keras.backend as K
 
 class Network:
@@ -11,7 +12,7 @@ class Network:
   used in ADAPT should be wrapped with this class.
   '''
 
-  def __init__(self, model, skippable=None):
+  def __init__(self, model, skippable=None, jit_compile=True):
     '''Create a Keras model wrapper class from a Keras model.
 
     Args:
@@ -19,6 +20,9 @@ class Network:
       skippable: A list of Keras layer classes that can be skipped while getting
         the values. By default, all layers that created from `tensorflow.keras.layers.Flatten`
         and `tensorflow.keras.layers.InputLayer` will be skipped.
+      jit_compile: A boolean. If true, compile the calculation of the values with
+        XLA. Set to false for models with operations that XLA does not support.
+        By default, use true.
 
     Example:
 
@@ -35,9 +39,42 @@ class Network:
       skippable = [InputLayer, Flatten]
     self.skippable = skippable
 
+    # Sizes of the internal layers (the layers that are not skippable, except
+    # for the last one), and their offsets in the flat list of neurons. The
+    # structure of the model does not change, so they are calculated once.
+    self.layer_sizes = np.array([l.output.shape[-1] for l in self.layers[:-1]], dtype=np.int32)
+    self.offsets = np.cumsum(np.concatenate([[0], self.layer_sizes]))
+
     # Functors that returns the outputs of the not skippable layers.
     self.functors = Model(inputs = self.model.input, outputs = [l.output for l in self.model.layers if type(l) not in self.skippable])
-    
+
+    # A compiled function that calculates the outputs of the neurons. It is
+    # traced once, and XLA fuses the reduction of each layer into the layer.
+    # The flag is kept, so that the functions that wrap the network follow it.
+    self.jit_compile = bool(jit_compile)
+    self.compiled = tf.function(self.outputs, jit_compile=self.jit_compile)
+
+    # The dtype that the model computes in (e.g. bfloat16 for a model built
+    # with the "mixed_bfloat16" policy of Keras).
+    self.compute_dtype = tf.as_dtype(getattr(self.model, 'compute_dtype', tf.float32))
+
+    # Compiled trails with their variables for each input shape. The trails are
+    # shared by all fuzzers testing the network, so each is traced only once.
+    self.trails = {}
+
+  def outputs(self, x):
+    '''Calculate the outputs of the neurons in the layers that are not skippable.
+
+    Args:
+      x: An input to process.
+
+    Returns:
+      A list of the values of the neurons in each layer, including the logits.
+    '''
+
+    # Get output and normalize to get the output of the neurons.
+    return [K.mean(K.reshape(l, (-1, l.shape[-1])), axis = 0) for l in self.functors(x)]
+
   def predict(self, x):
     '''Calculate the internal values and the logits of the input.
     
@@ -65,14 +102,97 @@ class Network:
     TensorShape([1000])
     '''
 
-    # Get output and normalize to get the output of the neurons.
-    outs = [K.mean(K.reshape(l, (-1, l.shape[-1])), axis = 0) for l in self.functors(x)]
+    # Get the output of the neurons.
+    outs = self.compiled(x)
 
     # Return internal outputs and logits.
     internals = outs[:-1]
     logits = outs[-1]
     return internals, logits
 
+  def forward(self, x):
+    '''Calculate the internal values and the logits of a float32 input.
+
+    The input is cast to the compute dtype of the model, and the results are
+    cast back to float32. For a model with mixed precision, the forward and
+    backward passes run in the reduced precision, while the gradient steps are
+    accumulated in the float32 input.
+
+    Args:
+      x: A float32 input with the batch dimension of 1.
+
+    Returns:
+      A tuple of a list of the values of internal neurons in each layer and logits
+    '''
+
+    internals, logits = self.predict(tf.cast(x, self.compute_dtype))
+    return [tf.cast(i, tf.float32) for i in internals], tf.cast(logits, tf.float32)
+
+  def trail(self, shape):
+    '''Returns a compiled trail of fuzzing for inputs of a shape.
+
+    A trail calculates the gradients of the fuzzing loss, generates the next
+    input using them, and gets the properties of the generated input with its
+    perturbation. The input under mutation and its difference from the original
+    input are kept in variables, which are updated in-place by the trail.
+
+    The trail and the variables are created once for each shape, and shared by
+    all fuzzers testing the network. Therefore, a network should not be fuzzed
+    by multiple fuzzers concurrently. The trail is compiled with XLA if
+    `jit_compile` of the network is true.
+
+    Args:
+      shape: The shape of an input, without the batch dimension.
+
+    Returns:
+      A tuple of the trail, the variable of the input under mutation, and the
+      variable of its difference from the original input. The trail gets the
+      indices of the selected neurons in the flat list of neurons, the index of
+      the original label in logits, the learning rate, the neuron weight, and
+      the class weight, and returns a tuple of a list of the values of internal
+      neurons in each layer, logits, and the l2 norm of the perturbation.
+    '''
+
+    shape = tuple(int(d) for d in shape)
+
+    if shape in self.trails:
+      return self.trails[shape]
+
+    # Variables that hold the input under mutation, and its difference from the
+    # original input to measure the distance without subtraction.
+    mutated = tf.Variable(tf.zeros((1,) + shape, dtype=tf.float32))
+    difference = tf.Variable(tf.zeros_like(mutated))
+
+    @tf.function(jit_compile=self.jit_compile, input_signature=[
+      tf.TensorSpec([None], tf.int32),
+      tf.TensorSpec([], tf.int32),
+      tf.TensorSpec([], tf.float32),
+      tf.TensorSpec([], tf.float32),
+      tf.TensorSpec([], tf.float32),
+    ])
+    def step(indices, orig_index, lr, neuron_weight, class_weight):
+
+      # Calculate gradients.
+      with tf.GradientTape() as t:
+        t.watch(mutated)
+        internals, logits = self.forward(mutated)
+        neuron_sum = tf.reduce_sum(tf.gather(tf.concat(internals, axis=0), indices))
+        loss = neuron_weight * neuron_sum - class_weight * tf.gather(logits, orig_index)
+      dl_di = t.gradient(loss, mutated)
+
+      # Generate the next input using gradients.
+      update = lr * dl_di
+      mutated.assign_add(update)
+      difference.assign_add(update)
+
+      # Get the properties of the generated input.
+      internals, logits = self.forward(mutated)
+      return internals, logits, tf.norm(difference)
+
+    self.trails[shape] = (step, mutated, difference)
+
+    return self.trails[shape]
+
   @property
   def layers(self):
     '''A list of layers that is not skippable.
@@ -13,6 +13,7 @@ from tensorflow.keras.layers import ZeroPadding2D
 import numpy as np
 
 from adapt.strategy.strategy import Strategy
+from adapt.utils.functional import flatten
 from adapt.utils.functional import greedy_max_set
 
 class FeatureMatrix:
@@ -135,8 +136,8 @@ class FeatureMatrix:
     
     Args:
       covered_count: A list of numbers of covering for each neuron.
-      objective_covered: A list of coverage vectors when objective (e.g. adversarial
-        input) satisfies.
+      objective_covered: A flat coverage vector of the neurons covered when
+        objective (e.g. adversarial input) satisfies.
 
     Returns:
       Self for possible call chains.
@@ -246,7 +247,7 @@ class ParameterizedStrategy(Strategy):
     self.objective_covered = None
 
     # Create a random strategy.
-    self.strategy = np.random.uniform(-self.bound, self.bound, size=FeatureMatrix.TOTAL_FEATURES)
+    self.strategy = self.rng.uniform(-self.bound, self.bound, size=FeatureMatrix.TOTAL_FEATURES)
 
   def select(self, k):
     '''Select k neurons with highest scores.
@@ -263,7 +264,7 @@ class ParameterizedStrategy(Strategy):
 
     # Get k highest neurons and return their location.
     indices = np.argpartition(scores, -k)[-k:]
-    return [self.neurons[i] for i in indices]
+    return self.locations[indices].tolist()
 
   def init(self, covered, label, **kwargs):
     '''Initialize the variables of the strategy.
@@ -271,7 +272,7 @@ class ParameterizedStrategy(Strategy):
     This method should be called before all other methods in the class.
 
     Args:
-      covered: A list of coverage vectors that the initial input covers.
+      covered: A flat coverage vector that the initial input covers.
       label: A label of the initial input classified into.
       kwargs: Not used. Present for the compatibility with the super class.
 
@@ -284,13 +285,13 @@ class ParameterizedStrategy(Strategy):
     '''
     
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
-    if len(covered) != len(self.neurons):
+    covered = flatten(covered)
+    if len(covered) != self.num_neurons:
       raise ValueError('The number of neurons in network does not matches to the setting.')
 
     # Initialize the number of covering for each neuron.
-    self.covered_count = np.zeros_like(covered, dtype=int)
-    self.covered_count += covered
+    self.covered_count = np.zeros_like(covered, dtype=np.uint32)
+    np.add(self.covered_count, covered, out=self.covered_count, casting='unsafe')
 
     # Set the initial label.
     self.label = label
@@ -304,7 +305,7 @@ class ParameterizedStrategy(Strategy):
     '''Update the variable of the strategy.
 
     Args:
-      covered: A list of coverage vectors that a current input covers.
+      covered: A flat coverage vector that a current input covers.
       label: A label of a current input classified into.
       kwargs: Not used. Present for the compatibility with the super class.
 
@@ -313,14 +314,14 @@ class ParameterizedStrategy(Strategy):
     '''
     
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
+    covered = flatten(covered)
 
-    # Update the number of covering for each neuron.
-    self.covered_count += covered
+    # Update the number of covering for each neuron in-place.
+    np.add(self.covered_count, covered, out=self.covered_count, casting='unsafe')
 
     # If adversarial input found, update the coverage vector for objective satifaction.
     if self.label != label:
-      self.objective_covered = np.bitwise_or(self.objective_covered, covered)
+      np.bitwise_or(self.objective_covered, covered, out=self.objective_covered)
 
     # Update variable vectors
     self.matrix = self.matrix.update(self.covered_count, self.objective_covered)
@@ -374,7 +375,7 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     self.sigma = sigma
 
     # Create initial stratagies randomly.
-    self.strategies = [np.random.uniform(-self.bound, self.bound, size=FeatureMatrix.TOTAL_FEATURES) for _ in range(self.size)]
+    self.strategies = [self.rng.uniform(-self.bound, self.bound, size=FeatureMatrix.TOTAL_FEATURES) for _ in range(self.size)]
     self.strategy = self.strategies.pop(0)
 
     # Create a coverage vector for a strategy.
@@ -389,7 +390,7 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     This method should be called before all other methods in the class.
 
     Args:
-      covered: A list of coverage vectors that the initial input covers.
+      covered: A flat coverage vector that the initial input covers.
       label: A label of the initial input classified into.
       kwargs: Not used. Present for the compatibility with the super class.
 
@@ -400,7 +401,7 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     super(AdaptiveParameterizedStrategy, self).init(covered=covered, label=label, **kwargs)
 
     # Initialize coverage vector for one strategy.
-    self.strategy_covered = np.zeros(len(self.neurons), dtype=bool)
+    self.strategy_covered = np.zeros(self.num_neurons, dtype=bool)
 
     return self
 
@@ -408,7 +409,7 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     '''Update the variable of the strategy.
 
     Args:
-      covered: A list of coverage vectors that a current input covers.
+      covered: A flat coverage vector that a current input covers.
       label: A label of a current input classified into.
       kwargs: Not used. Present for the compatibility with the super class.
 
@@ -419,8 +420,8 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     super(AdaptiveParameterizedStrategy, self).update(covered=covered, label=label, **kwargs)
 
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
-    self.strategy_covered = np.bitwise_or(self.strategy_covered, covered)
+    covered = flatten(covered)
+    np.bitwise_or(self.strategy_covered, covered, out=self.strategy_covered)
 
     return self
 
@@ -434,13 +435,14 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
       Self for possible call chains.
     '''
 
-    # Finish current strategy.
+    # Finish current strategy. The coverage vector is updated in-place, so the
+    # next strategy starts with a new one.
     self.records.append((self.strategy, self.strategy_covered))
+    self.strategy_covered = np.zeros_like(self.strategy_covered, dtype=bool)
 
     # Get the next strategy.
     if len(self.strategies) > 0:
       self.strategy = self.strategies.pop(0)
-      self.strategy_covered = np.zeros_like(self.strategy_covered, dtype=bool)
       return self
 
     # Generate next strategies from the past records.
@@ -463,17 +465,17 @@ class AdaptiveParameterizedStrategy(ParameterizedStrategy):
     # Mix strategies randomly.
     n = len(selected)
     generation = ceil(1 / self.remainder)
-    left = selected[np.random.permutation(n)]
-    right = selected[np.random.permutation(n)]
+    left = selected[self.rng.permutation(n)]
+    right = selected[self.rng.permutation(n)]
 
     for l, r in zip(left, right):
       for _ in range(generation):
 
         # Generate new strategy.
-        s = np.array([l[i] if np.random.choice([True, False]) else r[i] for i in range(FeatureMatrix.TOTAL_FEATURES)])
+        s = np.where(self.rng.integers(2, size=FeatureMatrix.TOTAL_FEATURES, dtype=bool), l, r)
 
         # Add little distortion.
-        s = s + np.random.normal(0, self.sigma, size=FeatureMatrix.TOTAL_FEATURES)
+        s = s + self.rng.normal(0, self.sigma, size=FeatureMatrix.TOTAL_FEATURES)
 
         # Clip the ranges.
         s = np.clip(s, -self.bound, self.bound)
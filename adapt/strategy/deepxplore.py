@@ -1,6 +1,7 @@
 import numpy as np
 
 from adapt.strategy.strategy import Strategy
+from adapt.utils.functional import flatten
 
 class UncoveredRandomStrategy(Strategy):
   '''A strategy that randomly selects neurons from uncovered neurons.
@@ -47,14 +48,14 @@ class UncoveredRandomStrategy(Strategy):
     '''
 
     # Find a set of uncovered neurons.
-    candidates = np.squeeze(np.argwhere(self.covered < 1))
+    candidates = np.flatnonzero(~self.covered)
 
     # Guard for the range of k.
     k = min(k, len(candidates))
 
     # Choose k neurons and return their location. 
-    indices = np.random.choice(candidates, size=k, replace=False)
-    return [self.neurons[i] for i in indices]
+    indices = self.rng.choice(candidates, size=k, replace=False)
+    return self.locations[indices].tolist()
 
   def init(self, covered, **kwargs):
     '''Initialize the variable of the strategy.
@@ -62,7 +63,7 @@ class UncoveredRandomStrategy(Strategy):
     This method should be called before all other methods in the class.
 
     Args:
-      covered: A list of coverage vectors that the initial input covers.
+      covered: A flat coverage vector that the initial input covers.
       kwargs: Not used. Present for the compatibility with the super class.
 
     Returns:
@@ -73,9 +74,9 @@ class UncoveredRandomStrategy(Strategy):
         to the network setting.
     '''
 
-    # Flatten coverage vectors.
-    self.covered = np.concatenate(covered)
-    if len(self.covered) != len(self.neurons):
+    # Flatten coverage vectors, as a bool vector owned by the strategy.
+    self.covered = flatten(covered).astype(bool)
+    if len(self.covered) != self.num_neurons:
       raise ValueError('The number of neurons in network does not matches to the setting.')  
 
     return self
@@ -84,7 +85,7 @@ class UncoveredRandomStrategy(Strategy):
     '''Update the variable of the strategy.
 
     Args:
-      covered: A list of coverage vectors that a current input covers.
+      covered: A flat coverage vector that a current input covers.
       kwargs: Not used. Present for the compatibility with the super class.
 
     Returns:
@@ -92,9 +93,9 @@ class UncoveredRandomStrategy(Strategy):
     '''
 
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
+    covered = flatten(covered)
 
-    # Update coverage vectors.
-    self.covered = np.bitwise_or(self.covered, covered)
+    # Update coverage vectors in-place.
+    np.bitwise_or(self.covered, covered, out=self.covered)
 
     return self
@@ -2,6 +2,7 @@ from itertools import cycle
 import numpy as np
 
 from adapt.strategy.strategy import Strategy
+from adapt.utils.functional import flatten
 
 class DLFuzzRoundRobin(Strategy):
   '''A round-robin strategy that cycles 3 strategies that suggested by DLFuzz.
@@ -46,7 +47,8 @@ class DLFuzzRoundRobin(Strategy):
     self.covered_count = None
 
     # A pool of weights.
-    weights = []
+    weights = np.empty(self.num_neurons)
+    offset = 0
 
     # Collect all weights.
     for l in network.layers[:-1]:
@@ -62,18 +64,24 @@ class DLFuzzRoundRobin(Strategy):
       else:
         w = np.zeros(l.output.shape[1:])
       
-      # Calculate the weight of the neurons.
-      for ni in range(l.output.shape[-1]):
-        weights.append(np.mean(w[..., ni]))
+      # Calculate the weight of the neurons at once, by averaging over all axes
+      # except for the last one.
+      n = l.output.shape[-1]
+      weights[offset:offset + n] = np.mean(w, axis=tuple(range(w.ndim - 1)))
+      offset += n
 
     # Guard for the range of weight portion
     if weight_portion < 0 or weight_portion > 1:
       raise ValueError('The argument weight_portion is not in [0, 1].')
     self.weight_portion = weight_portion
     
+    # Sort the neurons by their weights once. This runs only at the creation,
+    # and the order is kept for the strategies that need other ranges of it.
+    self.weights_sorted = np.argsort(weights)
+
     # Find the neurons with high values.
-    k = int(len(self.neurons) * self.weight_portion)
-    self.weight_indices = np.argpartition(weights, -k)[-k:]
+    k = int(self.num_neurons * self.weight_portion)
+    self.weight_indices = self.weights_sorted[-k:]
 
     # Round-robin cycle
     if not order:
@@ -101,26 +109,32 @@ class DLFuzzRoundRobin(Strategy):
     # First strategy.
     if self.current == 1:
       
-      # Find k most covered neurons.
-      indices = np.argpartition(self.covered_count, -k)[-k:]
+      # Find k most covered neurons. A single neuron only needs the argmax.
+      if k == 1:
+        indices = [np.argmax(self.covered_count)]
+      else:
+        indices = np.argpartition(self.covered_count, -k)[-k:]
 
     # Second strategy.
     elif self.current == 2:
       
-      # Find k rarest covered neurons.
-      indices = np.argpartition(self.covered_count, k - 1)[:k]
+      # Find k rarest covered neurons. A single neuron only needs the argmin.
+      if k == 1:
+        indices = [np.argmin(self.covered_count)]
+      else:
+        indices = np.argpartition(self.covered_count, k - 1)[:k]
 
     # Third strategy.
     elif self.current == 3:
       
       # Randomly samples from the neurons with high weights.
-      indices = np.random.choice(self.weight_indices, size=k, replace=False)
+      indices = self.rng.choice(self.weight_indices, size=k, replace=False)
     
     # Unknown.
     else:
       raise ValueError('Unknown strategy. The strategy must be 1, 2, or 3.')
 
-    return [self.neurons[i] for i in indices]
+    return self.locations[indices].tolist()
 
   def init(self, covered, **kwargs):
     '''Initialize the variable of the strategy.
@@ -128,7 +142,7 @@ class DLFuzzRoundRobin(Strategy):
     This method should be called before all other methods in the class.
 
     Args:
-      covered: A list of coverage vectors that the initial input covers.
+      covered: A flat coverage vector that the initial input covers.
       kwargs: Not used. Present for the compatibility with the super class.
 
     Returns:
@@ -140,13 +154,13 @@ class DLFuzzRoundRobin(Strategy):
     '''
     
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
-    if len(covered) != len(self.neurons):
+    covered = flatten(covered)
+    if len(covered) != self.num_neurons:
       raise ValueError('The number of neurons in network does not matches to the setting.')
 
     # Initialize the number of covering for each neuron.
-    self.covered_count = np.zeros_like(covered, dtype=int)
-    self.covered_count += covered
+    self.covered_count = np.zeros_like(covered, dtype=np.uint32)
+    np.add(self.covered_count, covered, out=self.covered_count, casting='unsafe')
 
     return self
 
@@ -154,7 +168,7 @@ class DLFuzzRoundRobin(Strategy):
     '''Update the variable of the strategy.
 
     Args:
-      covered: A list of coverage vectors that a current input covers.
+      covered: A flat coverage vector that a current input covers.
       kwargs: Not used. Present for the compatibility with the super class.
 
     Returns:
@@ -162,10 +176,12 @@ class DLFuzzRoundRobin(Strategy):
     '''
     
     # Flatten coverage vectors.
-    covered = np.concatenate(covered)
+    covered = flatten(covered)
 
-    # Update the number of covering for each neuron.
-    self.covered_count += covered
+    # Update the number of covering for each neuron in-place.
+    np.add(self.covered_count, covered, out=self.covered_count, casting='unsafe')
+
+    return self
 
   def next(self):
     '''Move to the next strategy.
@@ -217,6 +233,7 @@ class MostCoveredStrategy(DLFuzzRoundRobin):
     # Remove unnecessary variables.
     del self.weight_portion
     del self.weight_indices
+    del self.weights_sorted
     del self.order
 
   def next(self):
@@ -1,5 +1,3 @@
-import numpy as np
-
 from adapt.strategy.strategy import Strategy
 
 class RandomStrategy(Strategy):
@@ -23,5 +21,5 @@ class RandomStrategy(Strategy):
     '''
 
     # Choose k neurons and return their location.
-    indices = np.random.choice(len(self.neurons), size=k, replace=False)
-    return [self.neurons[i] for i in indices]
+    indices = self.rng.choice(self.num_neurons, size=k, replace=False)
+    return self.locations[indices].tolist()
@@ -1,5 +1,6 @@
 from abc import ABC
 from abc import abstractmethod
+import numpy as np
 
 class Strategy(ABC):
   '''Abstract strategy class (used as an implementation base).'''
@@ -20,6 +21,17 @@ class Strategy(ABC):
       for ni in range(l.output.shape[-1]):
         self.neurons.append((li, ni))
 
+    # The number of neurons.
+    self.num_neurons = len(self.neurons)
+
+    # An array of the locations of all neurons, to gather the locations of the
+    # selected neurons at once.
+    self.locations = np.array(self.neurons, dtype=np.int32).reshape(-1, 2)
+
+    # A random generator for the strategy. Seeded from the global random state,
+    # so that `np.random.seed` still makes testing reproducible.
+    self.rng = np.random.default_rng(np.random.randint(2 ** 31 - 1))
+
   def __call__(self, k):
     '''Python magic call method.
 
@@ -52,7 +64,7 @@ class Strategy(ABC):
     Args:
       kwargs: A dictionary of keyword arguments. The followings are privileged
         arguments.
-      covered: A list of coverage vectors that the initial input covers.
+      covered: A flat coverage vector that the initial input covers.
       label: A label that initial input classified into.
 
     Returns:
@@ -71,7 +83,7 @@ class Strategy(ABC):
     Args:
       kwargs: A dictionary of keyword arguments. The followings are privileged
         arguments.
-      covered: A list of coverage vectors that a current input covers.
+      covered: A flat coverage vector that a current input covers.
       label: A label that a current input classified into.
 
     Returns:
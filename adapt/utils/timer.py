@@ -1,5 +1,6 @@
 from datetime import datetime
 from datetime import timedelta
+import time
 
 class Timeout(Exception):
   '''An exception that raised by Timer when the set time budget is expired.'''
@@ -37,6 +38,11 @@ class Timer:
     # Set start time as the creation time.
     self.start_time = datetime.now()
 
+    # Use the monotonic clock for the deadline. It is cheaper than creating a
+    # datetime for every check, and does not jump with the system clock.
+    self.start_clock = time.monotonic()
+    self.deadline = self.start_clock + self.time_budget.total_seconds()
+
   def check_timeout(self):
     '''Check whether time budget is expired or not.
 
@@ -68,7 +74,7 @@ class Timer:
     '''
 
     # Check if time budget is expired.
-    if datetime.now() - self.start_time > self.time_budget:
+    if time.monotonic() > self.deadline:
       raise Timeout()
 
   @property
@@ -84,4 +90,4 @@ class Timer:
     13
     '''
 
-    return datetime.now() - self.start_time
+    return timedelta(seconds=time.monotonic() - self.start_clock)
@@ -11,7 +11,7 @@ setup_params = dict(
   license='MIT',
   packages=find_packages(exclude=['docker', 'tutorial', 'venv']),
   setup_requires=[], 
-  install_requires=['tensorflow>=2.0.0', 'imageio'], 
+  install_requires=['tensorflow>=2.5.0', 'imageio'], 
   dependency_links=[],
 )
 